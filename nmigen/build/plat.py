@@ -19,6 +19,18 @@ from .run import *
 __all__ = ["Platform", "TemplatedPlatform"]
 
 
+def _options(opts):
+    if isinstance(opts, str):
+        return opts
+    else:
+        return " ".join(opts)
+
+
+@jinja2.pass_context
+def _hierarchy(context, signal, separator):
+    return separator.join(context["name_map"][signal][1:])
+
+
 class Platform(ResourceManager, metaclass=ABCMeta):
     resources      = abstractproperty()
     connectors     = abstractproperty()
@@ -241,6 +253,14 @@ class TemplatedPlatform(Platform):
     file_templates    = abstractproperty()
     command_templates = abstractproperty()
 
+    # Templates are compiled once per process and reused across builds. The environment is shared
+    # between all platforms and builds, so its filters must take any per-build state from
+    # the render context.
+    _template_env   = jinja2.Environment(trim_blocks=True, lstrip_blocks=True)
+    _template_env.filters["options"]   = _options
+    _template_env.filters["hierarchy"] = _hierarchy
+    _template_cache = {}
+
     build_script_templates = {
         "build_{{name}}.sh": """
             # {{autogenerated}}
@@ -261,11 +281,11 @@ class TemplatedPlatform(Platform):
         # and to incorporate the nMigen version into generated code.
         autogenerated = "Automatically generated by nMigen {}. Do not edit.".format(__version__)
 
-        name_map = None
+        name_map = SignalDict()
         def emit_design(backend):
-            nonlocal name_map
             backend_mod = {"rtlil": rtlil, "verilog": verilog}[backend]
-            design_text, name_map = backend_mod.convert_fragment(fragment, name=name)
+            design_text, design_name_map = backend_mod.convert_fragment(fragment, name=name)
+            name_map.update(design_name_map)
             return design_text
 
         def emit_commands(format):
@@ -297,15 +317,6 @@ class TemplatedPlatform(Platform):
             else:
                 return jinja2.Undefined(name=var)
 
-        def options(opts):
-            if isinstance(opts, str):
-                return opts
-            else:
-                return " ".join(opts)
-
-        def hierarchy(signal, separator):
-            return separator.join(name_map[signal][1:])
-
         def verbose(arg):
             if "NMIGEN_verbose" in os.environ:
                 return arg
@@ -320,15 +331,17 @@ class TemplatedPlatform(Platform):
 
         def render(source, origin):
             try:
-                source   = textwrap.dedent(source).strip()
-                compiled = jinja2.Template(source, trim_blocks=True, lstrip_blocks=True)
-                compiled.environment.filters["options"] = options
-                compiled.environment.filters["hierarchy"] = hierarchy
-            except jinja2.TemplateSyntaxError as e:
-                e.args = ("{} (at {}:{})".format(e.message, origin, e.lineno),)
-                raise
+                compiled = self._template_cache[source]
+            except KeyError:
+                try:
+                    compiled = self._template_env.from_string(textwrap.dedent(source).strip())
+                except jinja2.TemplateSyntaxError as e:
+                    e.args = ("{} (at {}:{})".format(e.message, origin, e.lineno),)
+                    raise
+                self._template_cache[source] = compiled
             return compiled.render({
                 "name": name,
+                "name_map": name_map,
                 "platform": self,
                 "emit_design": emit_design,
                 "emit_commands": emit_commands,
@@ -0,0 +1,81 @@
+from .. import *
+from ..build.dsl import *
+from ..build.plat import *
+from .tools import *
+
+
+class _InterleavingTemplateCache(dict):
+    # Builds another design right before a template that uses the `hierarchy` filter is rendered,
+    # as if that build was running concurrently in another thread.
+    interleave = None
+
+    def __getitem__(self, source):
+        if "hierarchy" in source and self.interleave is not None:
+            interleave, self.interleave = self.interleave, None
+            interleave()
+        return super().__getitem__(source)
+
+
+class MockTemplatedPlatform(TemplatedPlatform):
+    toolchain      = "Mock"
+    resources      = [
+        Resource("led", 0, Pins("A0", dir="o")),
+    ]
+    connectors     = []
+    required_tools = []
+
+    file_templates = {
+        "{{name}}.il": r"""
+            {{emit_design("rtlil")}}
+        """,
+        "{{name}}.hier": r"""
+            {{platform.signal|hierarchy("/")}}
+        """,
+    }
+    command_templates = []
+
+    _template_cache = _InterleavingTemplateCache()
+
+    def __init__(self, submodule_name):
+        super().__init__()
+        self.submodule_name = submodule_name
+        self.signal         = Signal(name="sig_{}".format(submodule_name))
+
+    def create_missing_domain(self, name):
+        pass
+
+    def prepare(self, name):
+        m = Module()
+        m.submodules[self.submodule_name] = inner = Module()
+        inner.d.comb += self.signal.eq(1)
+        m.d.comb += self.request("led", 0).o.eq(self.signal)
+        return super().prepare(m, name)
+
+
+class TemplatedPlatformTestCase(FHDLTestCase):
+    def test_hierarchy_interleaved(self):
+        expected_a = MockTemplatedPlatform("a").prepare("top_a").files["top_a.hier"]
+        expected_b = MockTemplatedPlatform("b").prepare("top_b").files["top_b.hier"]
+        self.assertIn("sig_a", expected_a)
+        self.assertIn("sig_b", expected_b)
+
+        plans = {}
+        def build_b():
+            plans["b"] = MockTemplatedPlatform("b").prepare("top_b")
+        MockTemplatedPlatform._template_cache.interleave = build_b
+        plans["a"] = MockTemplatedPlatform("a").prepare("top_a")
+
+        self.assertEqual(plans["a"].files["top_a.hier"], expected_a)
+        self.assertEqual(plans["b"].files["top_b.hier"], expected_b)
+
+    def test_templates_compiled_once(self):
+        MockTemplatedPlatform("a").prepare("top_a")
+        cache = MockTemplatedPlatform._template_cache
+        for source in MockTemplatedPlatform.file_templates.values():
+            self.assertIn(source, cache)
+        compiled = dict(cache)
+
+        MockTemplatedPlatform("b").prepare("top_b")
+        self.assertEqual(cache.keys(), compiled.keys())
+        for source, template in compiled.items():
+            self.assertIs(dict.__getitem__(cache, source), template)